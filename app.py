@@ -1,10 +1,15 @@
 import importlib
 import os
+import re
 import sys
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 
+# CLI --params coercion: ints and decimals become numbers, everything else stays a string
+_NUM_RE = re.compile(r'^\s*[-+]?\d+\s*$')  # sign and surrounding whitespace allowed, as with int()
+_FLOAT_RE = re.compile(r'^\s*[-+]?\d+\.\d+\s*$')
+
 class BotConfig(BaseModel):
     name: str
     description: str
@@ -16,44 +21,52 @@ class BotManager:
     def __init__(self):
         self.bots_dir = Path("bots")
         self.bots_dir.mkdir(exist_ok=True)
-        self.bots: Dict[str, Any] = {}
+        self.bot_names: List[str] = []
+        self.bots: Dict[str, Any] = {}  # instantiated lazily by get_bot()
         self.load_bots()
 
     def load_bots(self):
-        """Load all bots from the bots directory"""
+        """Discover bots in the bots directory without importing them"""
         self.bots = {}
         # Ensure 'bots' is importable by adding project root to sys.path
         project_root = Path(__file__).parent
         if str(project_root) not in sys.path:
             sys.path.insert(0, str(project_root))
 
-        for init_file in self.bots_dir.glob("*/__init__.py"):
-            bot_name = init_file.parent.name
-            try:
-                module = importlib.import_module(f"bots.{bot_name}")
-                if hasattr(module, "Bot"):
-                    self.bots[bot_name] = module.Bot()
-            except Exception as e:
-                print(f"Error loading bot {bot_name}: {e}")
+        self.bot_names = sorted(init_file.parent.name for init_file in self.bots_dir.glob("*/__init__.py"))
+
+    def get_bot(self, bot_name: str) -> Any:
+        """Import and instantiate a bot on first use; later calls reuse the instance"""
+        if bot_name not in self.bots:
+            if bot_name not in self.bot_names:
+                raise ValueError(f"Bot '{bot_name}' not found")
+            module = importlib.import_module(f"bots.{bot_name}")
+            if not hasattr(module, "Bot"):
+                raise ValueError(f"Bot '{bot_name}' not found")
+            self.bots[bot_name] = module.Bot()
+        return self.bots[bot_name]
 
     def list_bots(self) -> List[Dict[str, Any]]:
         """List all available bots with their metadata"""
-        return [
-            {
+        bots = []
+        for name in self.bot_names:
+            try:
+                bot = self.get_bot(name)
+            except Exception as e:
+                print(f"Error loading bot {name}: {e}")
+                continue
+            bots.append({
                 "name": name,
                 "description": getattr(bot, "description", "No description"),
                 "author": getattr(bot, "author", "Unknown"),
                 "version": getattr(bot, "version", "1.0.0"),
                 "commands": [m for m in dir(bot) if not m.startswith('_') and callable(getattr(bot, m))]
-            }
-            for name, bot in self.bots.items()
-        ]
+            })
+        return bots
 
     def run_bot(self, bot_name: str, *args, **kwargs):
         """Run a specific bot"""
-        if bot_name not in self.bots:
-            raise ValueError(f"Bot '{bot_name}' not found")
-        return self.bots[bot_name].run(*args, **kwargs)
+        return self.get_bot(bot_name).run(*args, **kwargs)
 
 if __name__ == "__main__":
     import argparse
@@ -89,16 +102,10 @@ if __name__ == "__main__":
         try:
             print(f"Running bot: {args.bot_name}")
             raw_params = args.params or []
-            coerced_params = []
-            for p in raw_params:
-                # Try int
-                try:
-                    coerced_params.append(int(p))
-                    continue
-                except ValueError:
-                    pass
-                # Leave as string fallback
-                coerced_params.append(p)
+            coerced_params = [
+                int(p) if _NUM_RE.match(p) else float(p) if _FLOAT_RE.match(p) else p
+                for p in raw_params
+            ]
             result = manager.run_bot(args.bot_name, *coerced_params)
             print(f"Bot completed. Result: {result}")
         except Exception as e:
@@ -0,0 +1,77 @@
+"""
+HTML parsing helpers shared by the scraper bots.
+
+Uses selectolax (C-backed Modest engine) when it is installed and falls back to
+BeautifulSoup with the pure-Python "html.parser" otherwise. Bots should go through
+these helpers instead of calling either library directly so both backends work.
+"""
+import functools
+from typing import Any, List, Optional
+
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:  # fall back to the slower pure-Python stack
+    HTMLParser = None
+    import soupsieve
+    from bs4 import BeautifulSoup
+
+
+def parse(html) -> Any:
+    """Parse an HTML document (str or bytes) and return the backend's root node."""
+    if HTMLParser is not None:
+        return HTMLParser(html)
+    return BeautifulSoup(html, "html.parser")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_selector(selector: str) -> Any:
+    """
+    Return a reusable compiled form of a CSS selector.
+
+    With BeautifulSoup this is a cached soupsieve matcher, so each selector is parsed once
+    per process. selectolax only accepts query strings, so the string is returned as-is.
+    """
+    if HTMLParser is not None:
+        return selector
+    return soupsieve.compile(selector)
+
+
+def _compiled(selector: Any) -> Any:
+    return compile_selector(selector) if isinstance(selector, str) else selector
+
+
+def css(node: Any, selector: Any) -> List[Any]:
+    """Return all nodes under `node` matching a CSS selector (string or compile_selector() result)."""
+    if HTMLParser is not None:
+        return node.css(selector)
+    return _compiled(selector).select(node)
+
+
+def css_first(node: Any, selector: Any) -> Optional[Any]:
+    """Return the first node under `node` matching a CSS selector, or None."""
+    if HTMLParser is not None:
+        return node.css_first(selector)
+    return _compiled(selector).select_one(node)
+
+
+def text(node: Any, strip: bool = False) -> str:
+    """Return the concatenated text content of a node."""
+    if HTMLParser is not None:
+        return node.text(strip=strip)
+    return node.get_text(strip=strip)
+
+
+def attr(node: Any, name: str, default: Optional[str] = None) -> Optional[str]:
+    """Return an attribute value of a node, or `default` when missing/empty."""
+    value = node.attributes.get(name) if HTMLParser is not None else node.get(name)
+    return value if value is not None else default
+
+
+def next_sibling(node: Any, tag: str) -> Optional[Any]:
+    """Return the next sibling element with the given tag name, skipping text nodes."""
+    if HTMLParser is None:
+        return node.find_next_sibling(tag)
+    sibling = node.next
+    while sibling is not None and sibling.tag != tag:
+        sibling = sibling.next
+    return sibling
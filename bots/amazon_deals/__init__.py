@@ -1,10 +1,31 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import functools
+import orjson
 import random
+import re
 from datetime import datetime
 from fake_useragent import UserAgent
 
+from .. import _html
+
+_PRICE_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Compiled once at import so the first page doesn't pay for selector parsing
+_SELECTORS = {
+    'tile': _html.compile_selector('div.dealTile'),
+    'title': _html.compile_selector('div.dealTitle'),
+    'price': _html.compile_selector('span.priceBlockDealPriceString'),
+    'discount': _html.compile_selector('div.itemPriceDrop'),
+    'rating': _html.compile_selector('i.a-icon-star'),
+}
+
+@functools.lru_cache(maxsize=1)
+def _ua_pool():
+    """Shared UserAgent instance; loading its dataset is expensive, so do it once and only when needed"""
+    return UserAgent()
+
 class Bot:
     """
     A bot that scrapes deals from Amazon
@@ -17,13 +38,19 @@ class Bot:
     def __init__(self):
         self.base_url = "https://www.amazon.com/gp/goldbox"
         self.output_dir = "data/amazon_deals"
+        self._ua = None  # picked on first run(), see _ua_pool()
         self.headers = {
-            'User-Agent': UserAgent().random,
             'Accept-Language': 'en-US,en;q=0.9',
             'Accept-Encoding': 'gzip, deflate, br',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8',
             'Connection': 'keep-alive',
         }
+        # Reuse keep-alive connections across requests/runs
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=3, backoff_factor=0.3))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def get_proxy(self):
         """Get a random proxy (you should implement your own proxy rotation)"""
@@ -41,6 +68,10 @@ class Bot:
             import os
             os.makedirs(self.output_dir, exist_ok=True)
             
+            if self._ua is None:
+                self._ua = _ua_pool().random
+                self.session.headers['User-Agent'] = self._ua
+            
             # Prepare the URL
             url = self.base_url
             params = {}
@@ -49,9 +80,8 @@ class Bot:
                 
             # Make the request
             proxies = self.get_proxy()
-            response = requests.get(
+            response = self.session.get(
                 url, 
-                headers=self.headers, 
                 params=params,
                 proxies=proxies,
                 timeout=30
@@ -59,34 +89,34 @@ class Bot:
             response.raise_for_status()
             
             # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            tree = _html.parse(response.content)
             
             # Find deal containers (this selector might need adjustment)
-            deal_containers = soup.select('div.dealTile')
+            deal_containers = _html.css(tree, _SELECTORS['tile'])
             deals = []
             
             for container in deal_containers[:limit]:
                 try:
-                    title_elem = container.select_one('div.dealTitle')
+                    title_elem = _html.css_first(container, _SELECTORS['title'])
                     if not title_elem:
                         continue
                         
-                    title = title_elem.text.strip()
-                    url = title_elem.get('href', '')
+                    title = _html.text(title_elem).strip()
+                    url = _html.attr(title_elem, 'href', '')
                     if url and not url.startswith('http'):
                         url = f"https://www.amazon.com{url}"
                     
                     # Get price information
-                    price_elem = container.select_one('span.priceBlockDealPriceString')
-                    price = price_elem.text.strip() if price_elem else "Price not available"
+                    price_elem = _html.css_first(container, _SELECTORS['price'])
+                    price = _html.text(price_elem).strip() if price_elem else "Price not available"
                     
                     # Get discount
-                    discount_elem = container.select_one('div.itemPriceDrop')
-                    discount = discount_elem.text.strip() if discount_elem else "Discount not specified"
+                    discount_elem = _html.css_first(container, _SELECTORS['discount'])
+                    discount = _html.text(discount_elem).strip() if discount_elem else "Discount not specified"
                     
                     # Get rating
-                    rating_elem = container.select_one('i.a-icon-star')
-                    rating = rating_elem.text.strip() if rating_elem else "Rating not available"
+                    rating_elem = _html.css_first(container, _SELECTORS['rating'])
+                    rating = _html.text(rating_elem).strip() if rating_elem else "Rating not available"
                     
                     deals.append({
                         'title': title,
@@ -105,13 +135,13 @@ class Bot:
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             output_file = f"{self.output_dir}/deals_{timestamp}.json"
             
-            with open(output_file, 'w') as f:
-                json.dump({
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps({
                     'source': 'Amazon Deals',
                     'scraped_at': datetime.utcnow().isoformat(),
                     'category': category or 'All',
                     'deals': deals
-                }, f, indent=2)
+                }, option=orjson.OPT_INDENT_2))
             
             print(f"Successfully scraped {len(deals)} deals. Saved to {output_file}")
             return {"status": "success", "deals_found": len(deals), "output_file": output_file}
@@ -132,16 +162,12 @@ class Bot:
         # Basic analysis
         total_deals = len(deals)
         
-        # Extract prices (this is simplified, you'd need to parse the price strings)
-        prices = []
-        for deal in deals:
-            try:
-                # This is a very basic price extraction - you'd need to improve this
-                price_str = ''.join(c for c in deal.get('price', '') if c.isdigit() or c == '.')
-                if price_str:
-                    prices.append(float(price_str))
-            except:
-                continue
+        # Extract prices: first number in the price string, ignoring thousands separators
+        prices = [
+            float(m.group(0))
+            for deal in deals
+            if (m := _PRICE_RE.search((deal.get('price') or '').replace(',', ''))) is not None
+        ]
         
         avg_price = sum(prices) / len(prices) if prices else 0
         min_price = min(prices) if prices else 0
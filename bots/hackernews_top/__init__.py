@@ -1,8 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 from datetime import datetime
 
+from .. import _html
+
+# Compiled once at import so the first page doesn't pay for selector parsing
+_ATHING = _html.compile_selector('tr.athing')
+_TITLE = _html.compile_selector('span.titleline > a')
+_SCORE = _html.compile_selector('span.score')
+_LINK = _html.compile_selector('a')
+
 class Bot:
     """
     A bot that scrapes the top stories from Hacker News
@@ -15,6 +24,17 @@ class Bot:
     def __init__(self):
         self.base_url = "https://news.ycombinator.com"
         self.output_dir = "data/hackernews"
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        }
+        # Reuse keep-alive connections across requests/runs
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=3, backoff_factor=0.3))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         
     def run(self, limit: int = 10):
         """
@@ -27,35 +47,35 @@ class Bot:
             os.makedirs(self.output_dir, exist_ok=True)
             
             # Fetch the homepage
-            response = requests.get(self.base_url)
+            response = self.session.get(self.base_url, timeout=30)
             response.raise_for_status()
             
             # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            tree = _html.parse(response.content)
             
             # Find all story rows
             stories = []
-            rows = soup.select('tr.athing')
+            rows = _html.css(tree, _ATHING)
             
             for row in rows[:limit]:
-                title_elem = row.select_one('span.titleline > a')
+                title_elem = _html.css_first(row, _TITLE)
                 if not title_elem:
                     continue
                     
-                title = title_elem.text
-                url = title_elem['href']
+                title = _html.text(title_elem)
+                url = _html.attr(title_elem, 'href', '')
                 
                 # Get score and comments
-                next_row = row.find_next_sibling('tr')
-                score_elem = next_row.select_one('span.score')
-                score = int(score_elem.text.split()[0]) if score_elem else 0
+                next_row = _html.next_sibling(row, 'tr')
+                score_elem = _html.css_first(next_row, _SCORE)
+                score = int(_html.text(score_elem).split()[0]) if score_elem else 0
                 
                 # Get number of comments
-                links = next_row.find_all('a')
-                comments_link = next((a for a in links if 'comment' in a.text.lower()), None)
+                links = [_html.text(a) for a in _html.css(next_row, _LINK)]
+                comments_text = next((t for t in links if 'comment' in t.lower()), None)
                 num_comments = 0
-                if comments_link and comments_link.text.strip():
-                    num_comments = int(comments_link.text.split()[0])
+                if comments_text and comments_text.strip():
+                    num_comments = int(comments_text.split()[0])
                 
                 stories.append({
                     'title': title,
@@ -69,12 +89,12 @@ class Bot:
             timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
             output_file = f"{self.output_dir}/top_stories_{timestamp}.json"
             
-            with open(output_file, 'w') as f:
-                json.dump({
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps({
                     'source': 'Hacker News',
                     'scraped_at': datetime.utcnow().isoformat(),
                     'stories': stories
-                }, f, indent=2)
+                }, option=orjson.OPT_INDENT_2))
             
             print(f"Successfully scraped {len(stories)} stories. Saved to {output_file}")
             return {"status": "success", "stories_found": len(stories), "output_file": output_file}
@@ -1,16 +1,41 @@
+import asyncio
+import functools
+import html
+import io
 import re
+import sys
 import json
-from collections import deque, defaultdict
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Dict, Set, List, Tuple, Optional
-from urllib.parse import urljoin, urlparse, urldefrag
+from urllib.parse import ParseResult, urljoin, urlparse, urldefrag
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from lxml import etree
+
+from .. import _html
+
+
+_META_REFRESH_RE = re.compile("refresh", re.I)
+_META_URL_RE = re.compile(r"url=([^;]+)", re.I)
+_NODE_ID_RE = re.compile(r"[^a-zA-Z0-9]")
+# Fallback for sitemaps lxml rejects (typically a bare "&" in a query string)
+_LOC_RE = re.compile(r"<loc>(.*?)</loc>", re.I | re.S)
+_CHILD_SITEMAP_RE = re.compile(r"<sitemap>.*?<loc>(.*?)</loc>.*?</sitemap>", re.I | re.S)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parsed(url: str) -> ParseResult:
+    # the same URL is examined several times per crawl (link filter, host checks, sitemap filter)
+    return urlparse(url)
 
 
 @dataclass
 class PageInfo:
+    # explicit slots (no per-instance __dict__); dataclass(slots=True) needs Python 3.10+
+    __slots__ = ("url", "title", "status", "depth", "discovered_from", "out_links")
+
     url: str
     title: Optional[str]
     status: Optional[int]
@@ -37,107 +62,119 @@ class Bot:
     version = "0.1.0"
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.headers = {
             "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36"
-        })
+        }
         self.timeout = 15
         self.max_pages = 200  # safety cap
+        self.max_concurrency = 20  # in-flight page fetches
+        self.max_body_bytes = 2_000_000  # HTML beyond this is not read
+        self.parse_workers = 16  # threads parsing HTML alongside the fetches
 
     def run(self, start_url: str, max_depth: int = 2, same_domain_only: bool = True) -> Dict[str, any]:
         if not start_url:
             print("Usage: python app.py run site_mapper --params <start_url> [max_depth] [same_domain_only]")
             return {"status": "error", "error": "missing_start_url"}
 
-        start_url = self._canonicalize(start_url)
-        start_host = urlparse(start_url).netloc
+        return asyncio.run(self._run_async(start_url, max_depth, same_domain_only))
 
-        robots_info = self._fetch_robots(start_url)
-        sitemap_urls = self._discover_sitemaps(start_url, robots_info)
-        sitemap_routes = self._fetch_sitemap_routes(sitemap_urls)
+    async def _run_async(self, start_url: str, max_depth: int, same_domain_only: bool) -> Dict[str, any]:
+        start_url = self._canonicalize(start_url)
+        start_host = _parsed(start_url).netloc
 
         visited: Set[str] = set()
         pages: Dict[str, PageInfo] = {}
         edges: List[Tuple[str, str]] = []  # (from, to)
         by_depth: Dict[int, List[str]] = defaultdict(list)
 
-        q: deque[Tuple[str, int, Optional[str]]] = deque()
-        q.append((start_url, 0, None))
+        # HTTP/2 multiplexes concurrent requests to the same origin over one connection
+        limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        async with httpx.AsyncClient(http2=True, headers=self.headers, timeout=self.timeout, follow_redirects=True, limits=limits) as client:
+            robots_info = await self._fetch_robots(client, start_url)
+            sitemap_urls = self._discover_sitemaps(start_url, robots_info)
+            sitemap_routes = await self._fetch_sitemap_routes(client, sitemap_urls)
 
-        while q and len(visited) < self.max_pages:
-            url, depth, parent = q.popleft()
-            url = self._canonicalize(url)
-            if url in visited:
-                continue
-            if same_domain_only and urlparse(url).netloc != start_host:
-                continue
-            visited.add(url)
-
-            status, title, links = self._fetch_and_parse(url)
-            pages[url] = PageInfo(url=url, title=title, status=status, depth=depth, discovered_from=[parent] if parent else [], out_links=links)
-            by_depth[depth].append(url)
-            if parent:
-                edges.append((parent, url))
-
-            if depth < max_depth:
-                for l in links:
-                    l = self._canonicalize(urljoin(url, l))
-                    if not self._is_http(l):
-                        continue
-                    if same_domain_only and urlparse(l).netloc != start_host:
-                        continue
-                    if l not in visited:
-                        q.append((l, depth + 1, url))
+            sem = asyncio.Semaphore(self.max_concurrency)
+
+            # Pages are parsed on worker threads so the event loop keeps servicing fetches meanwhile
+            with ThreadPoolExecutor(max_workers=self.parse_workers) as executor:
+                # BFS one depth at a time: every URL of a wave is fetched concurrently
+                # URLs are canonicalized and filtered once, when enqueued, so each appears in at most one wave
+                enqueued: Set[str] = {start_url}
+                wave: List[Tuple[str, Optional[str]]] = [(start_url, None)]
+                depth = 0
+                while wave and len(visited) < self.max_pages:
+                    batch = wave[:self.max_pages - len(visited)]
+                    visited.update(url for url, _ in batch)
+
+                    results = await asyncio.gather(*[self._fetch_and_parse(client, sem, executor, url) for url, _ in batch])
+
+                    next_wave: List[Tuple[str, Optional[str]]] = []
+                    for (url, parent), (status, title, links) in zip(batch, results):
+                        pages[url] = PageInfo(url=url, title=title, status=status, depth=depth, discovered_from=[parent] if parent else [], out_links=links)
+                        by_depth[depth].append(url)
+                        if parent:
+                            edges.append((parent, url))
+
+                        if depth < max_depth:
+                            for l in links:
+                                l = self._canonicalize(urljoin(url, l))
+                                if not self._is_http(l):
+                                    continue
+                                if same_domain_only and _parsed(l).netloc != start_host:
+                                    continue
+                                if l in enqueued:
+                                    continue
+                                enqueued.add(l)
+                                next_wave.append((l, url))
+                    wave = next_wave
+                    depth += 1
 
         # Prepare unexposed routes (from sitemap that weren't visited)
-        unexposed = [u for u in sitemap_routes if u not in visited and (not same_domain_only or urlparse(u).netloc == start_host)]
-
-        # Print summary list
-        print("\nSite Map Summary")
-        print("=" * 40)
-        print(f"Start: {start_url}")
-        print(f"Max depth: {max_depth}")
-        print(f"Same domain only: {same_domain_only}")
-        print(f"Pages crawled: {len(visited)}")
-        print()
-        for d in sorted(by_depth.keys()):
-            print(f"Depth {d}:")
-            for u in sorted(by_depth[d]):
+        unexposed = [u for u in sitemap_routes if u not in visited and (not same_domain_only or _parsed(u).netloc == start_host)]
+
+        # Build the summary list and Mermaid diagram, then emit them with a single write
+        lines: List[str] = [
+            "\nSite Map Summary",
+            "=" * 40,
+            f"Start: {start_url}",
+            f"Max depth: {max_depth}",
+            f"Same domain only: {same_domain_only}",
+            f"Pages crawled: {len(visited)}",
+            "",
+        ]
+        for d in sorted(by_depth):
+            lines.append(f"Depth {d}:")
+            for u in by_depth[d]:  # discovery order; waves are processed deterministically
                 info = pages.get(u)
                 title = f" — {info.title}" if info and info.title else ""
                 status = f" [{info.status}]" if info and info.status else ""
-                print(f"  - {u}{status}{title}")
-            print("-" * 40)
+                lines.append(f"  - {u}{status}{title}")
+            lines.append("-" * 40)
 
         if unexposed:
-            print("Potential unexposed routes (from sitemap):")
+            lines.append("Potential unexposed routes (from sitemap):")
             for u in unexposed[:200]:  # cap output
-                print(f"  - {u}")
-            print("-" * 40)
-
-        # Print Mermaid diagram
-        print("Mermaid diagram:")
-        print("```mermaid")
-        print("graph TD")
-        printed_nodes: Set[str] = set()
+                lines.append(f"  - {u}")
+            lines.append("-" * 40)
+
+        # Mermaid diagram
+        lines += ["Mermaid diagram:", "```mermaid", "graph TD"]
+        node_ids: Dict[str, str] = {}  # url -> Mermaid id, filled as nodes are declared
         def node_id(u: str) -> str:
             # Simple safe id
-            return re.sub(r"[^a-zA-Z0-9]", "_", u)[:60]
+            return _NODE_ID_RE.sub("_", u)[:60]
         for frm, to in edges:
-            nid_from = node_id(frm)
-            nid_to = node_id(to)
-            if frm not in printed_nodes:
-                print(f"  {nid_from}[\"{frm}\"]")
-                printed_nodes.add(frm)
-            if to not in printed_nodes:
-                print(f"  {nid_to}[\"{to}\"]")
-                printed_nodes.add(to)
-            print(f"  {nid_from} --> {nid_to}")
+            for u in (frm, to):
+                if u not in node_ids:
+                    node_ids[u] = node_id(u)
+                    lines.append(f"  {node_ids[u]}[\"{u}\"]")
+            lines.append(f"  {node_ids[frm]} --> {node_ids[to]}")
         if not edges:
             # Isolated single page
-            nid = node_id(start_url)
-            print(f"  {nid}[\"{start_url}\"]")
-        print("```")
+            lines.append(f"  {node_id(start_url)}[\"{start_url}\"]")
+        lines.append("```")
+        sys.stdout.write("\n".join(lines) + "\n")
 
         return {
             "status": "success",
@@ -150,7 +187,9 @@ class Bot:
     # -----------------------------
     # Helpers
     # -----------------------------
-    def _canonicalize(self, url: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _canonicalize(url: str) -> str:
         if not url:
             return url
         # remove fragments, strip spaces
@@ -161,39 +200,64 @@ class Bot:
         return url
 
     def _is_http(self, url: str) -> bool:
-        scheme = urlparse(url).scheme.lower()
+        scheme = _parsed(url).scheme.lower()
         return scheme in {"http", "https"}
 
-    def _fetch_and_parse(self, url: str) -> Tuple[Optional[int], Optional[str], List[str]]:
+    async def _fetch_and_parse(
+        self, client: httpx.AsyncClient, sem: asyncio.Semaphore, executor: ThreadPoolExecutor, url: str
+    ) -> Tuple[Optional[int], Optional[str], List[str]]:
         try:
-            r = self.session.get(url, timeout=self.timeout, allow_redirects=True)
-            status = r.status_code
-            ctype = r.headers.get("Content-Type", "").lower()
+            async with sem:
+                async with client.stream("GET", url) as r:
+                    status = r.status_code
+                    ctype = r.headers.get("Content-Type", "").lower()
+                    if ctype and "html" not in ctype:
+                        # PDFs, images, archives...: leave the body undownloaded
+                        return status, None, []
+                    body = await self._read_capped(r)
             title = None
             links: List[str] = []
-            if "text/html" in ctype or r.text.strip().startswith("<"):
-                soup = BeautifulSoup(r.text, "html.parser")
-                t = soup.find("title")
-                title = t.get_text(strip=True) if t else None
-                for a in soup.find_all("a", href=True):
-                    href = a.get("href")
-                    if href:
-                        links.append(href)
-                # Also parse meta refresh redirects
-                for meta in soup.find_all("meta", attrs={"http-equiv": re.compile("refresh", re.I)}):
-                    content = meta.get("content") or ""
-                    m = re.search(r"url=([^;]+)", content, flags=re.I)
-                    if m:
-                        links.append(m.group(1).strip())
+            if "text/html" in ctype or body.strip().startswith(b"<"):
+                loop = asyncio.get_running_loop()
+                title, links = await loop.run_in_executor(executor, self._parse_page, body)
             return status, title, links
         except Exception:
             return None, None, []
 
-    def _fetch_robots(self, start_url: str) -> str:
+    def _parse_page(self, body: bytes) -> Tuple[Optional[str], List[str]]:
+        tree = _html.parse(body)
+        t = _html.css_first(tree, "title")
+        title = _html.text(t, strip=True) if t else None
+        links: List[str] = []
+        for a in _html.css(tree, "a[href]"):
+            href = _html.attr(a, "href")
+            if href:
+                links.append(href)
+        # Also parse meta refresh redirects
+        for meta in _html.css(tree, "meta[http-equiv]"):
+            if not _META_REFRESH_RE.search(_html.attr(meta, "http-equiv", "")):
+                continue
+            content = _html.attr(meta, "content", "")
+            m = _META_URL_RE.search(content)
+            if m:
+                links.append(m.group(1).strip())
+        return title, links
+
+    async def _read_capped(self, r: httpx.Response) -> bytes:
+        chunks: List[bytes] = []
+        size = 0
+        async for chunk in r.aiter_bytes(chunk_size=65536):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_body_bytes:
+                break
+        return b"".join(chunks)[:self.max_body_bytes]
+
+    async def _fetch_robots(self, client: httpx.AsyncClient, start_url: str) -> str:
         p = urlparse(start_url)
         robots_url = f"{p.scheme}://{p.netloc}/robots.txt"
         try:
-            r = self.session.get(robots_url, timeout=self.timeout)
+            r = await client.get(robots_url)
             if r.status_code < 400:
                 return r.text
         except Exception:
@@ -218,27 +282,65 @@ class Bot:
                 res.append(u)
         return res
 
-    def _fetch_sitemap_routes(self, sitemap_urls: List[str]) -> List[str]:
+    async def _fetch_sitemap_routes(
+        self,
+        client: httpx.AsyncClient,
+        sitemap_urls: List[str],
+        seen_sitemaps: Optional[Set[str]] = None,
+        seen_routes: Optional[Set[str]] = None,
+    ) -> List[str]:
+        # seen_* are shared across the whole recursion so sitemaps referenced by several
+        # index files are fetched once and each route is reported once
+        if seen_sitemaps is None:
+            seen_sitemaps = set()
+        if seen_routes is None:
+            seen_routes = set()
         routes: List[str] = []
         for sm in sitemap_urls:
+            if sm in seen_sitemaps:
+                continue
+            seen_sitemaps.add(sm)
             try:
-                r = self.session.get(sm, timeout=self.timeout)
+                r = await client.get(sm)
                 if r.status_code >= 400:
                     continue
-                text = r.text
-                # very simple XML parsing via regex to avoid adding dependencies
-                for loc in re.findall(r"<loc>(.*?)</loc>", text, flags=re.I):
-                    routes.append(self._canonicalize(loc.strip()))
-                # handle index sitemaps that list other sitemaps
-                for child in re.findall(r"<sitemap>.*?<loc>(.*?)</loc>.*?</sitemap>", text, flags=re.I | re.S):
-                    routes.extend(self._fetch_sitemap_routes([self._canonicalize(child.strip())]))
+                children: List[str] = []
+                for loc, is_child in self._sitemap_locs(r.content):
+                    loc = self._canonicalize(loc)
+                    if is_child:
+                        children.append(loc)
+                    elif loc not in seen_routes:
+                        seen_routes.add(loc)
+                        routes.append(loc)
+                if children:
+                    routes.extend(await self._fetch_sitemap_routes(client, children, seen_sitemaps, seen_routes))
             except Exception:
                 continue
-        # dedupe
-        dedup = []
-        seen = set()
-        for u in routes:
-            if u not in seen:
-                seen.add(u)
-                dedup.append(u)
-        return dedup
+        return routes
+
+    @staticmethod
+    def _sitemap_locs(body: bytes) -> List[Tuple[str, bool]]:
+        """(loc, is_child_sitemap) for every non-empty <loc>; ones under <sitemap> point at child sitemaps (index files)."""
+        locs: List[Tuple[str, bool]] = []
+        try:
+            # stream <loc> elements
+            for _, elem in etree.iterparse(io.BytesIO(body), events=("end",), tag="{*}loc", resolve_entities=False):
+                loc = (elem.text or "").strip()
+                parent = elem.getparent()
+                if loc:
+                    locs.append((loc, parent is not None and etree.QName(parent).localname == "sitemap"))
+                elem.clear()
+                # drop the finished <url>/<sitemap> entries before this one so the tree stays one entry deep
+                if parent is not None:
+                    while parent.getprevious() is not None:
+                        del parent.getparent()[0]
+            return locs
+        except etree.XMLSyntaxError:
+            # malformed XML: scan the raw text instead of dropping the whole sitemap
+            text = body.decode("utf-8", errors="replace")
+            children = {html.unescape(c.strip()) for c in _CHILD_SITEMAP_RE.findall(text)}
+            for loc in _LOC_RE.findall(text):
+                loc = html.unescape(loc.strip())
+                if loc:
+                    locs.append((loc, loc in children))
+            return locs
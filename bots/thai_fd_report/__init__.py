@@ -1,9 +1,10 @@
-import json
 import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 
+import orjson
+
 
 class Bot:
     """
@@ -78,10 +79,9 @@ class Bot:
             # pick latest in default_dir
             if not self.default_dir.exists():
                 return None
-            candidates = sorted(self.default_dir.glob("fd_rates_*.json"))
-            if not candidates:
+            # names embed a sortable UTC timestamp, so the lexicographic max is the newest (no stat calls)
+            path = max(self.default_dir.glob("fd_rates_*.json"), default=None)
+            if path is None:
                 return None
-            path = candidates[-1]
 
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return orjson.loads(path.read_bytes())
@@ -1,11 +1,63 @@
+import asyncio
+import contextlib
+import functools
+import os
 import re
 import json
 import time
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from itertools import islice
+from typing import List, Dict, Any, Optional, Set, Tuple
+from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from lxml import etree
+from lxml import html as lxml_html
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # fall back to lxml
+    LexborHTMLParser = None
+
+try:
+    from lxml.cssselect import CSSSelector
+except ImportError:  # needs the optional cssselect package; bank_selectors are skipped on the lxml path
+    CSSSelector = None
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib serializer
+    orjson = None
+
+
+_WS_RE = re.compile(r"\s+")
+# Thai digits (๐-๙) -> ASCII, so rates/terms and the stored raw text use one numeral set
+_THAI_DIGITS = str.maketrans("๐๑๒๓๔๕๖๗๘๙", "0123456789")
+# One pass finds both rates (1.50%, 2%, 0.85 %) and terms (3 months, 6M, 1 yr, 12 เดือน, 1 ปี);
+# matched against lowercased text, the first of each kind wins
+_OFFER_RE = re.compile(
+    r"(?P<rate>\d{1,2}(?:\.\d{1,3})?)\s*%"
+    r"|(?P<num>\d{1,2})\s*(?:(?P<month>(?:months?|mo|m)\b|เดือน)|(?:years?|yr|y)\b|ปี)"
+)
+
+# Elements the generic scan treats as one self-contained offer block
+_BLOCK_TAGS = frozenset({"section", "div", "li", "article"})
+
+# Compiled once; used by the lxml fallback in place of CSS selectors
+_XP_TABLES = etree.XPath("//table")
+_XP_ROWS = etree.XPath(".//tr")
+_XP_CELLS = etree.XPath(".//td|.//th")
+_XP_PERCENT_TEXT = etree.XPath("//text()[contains(., '%')]")
+# lxml refuses str input that starts with an encoding declaration (XHTML pages); the text is already decoded
+_XML_DECL_RE = re.compile(r"^\s*<\?xml[^>]*\?>")
+
+
+@functools.lru_cache(maxsize=64)
+def _css_xpath(selector: str) -> Any:
+    return CSSSelector(selector)
+
+# Header keywords (English + Thai equivalents) that mark a table as a rate table
+_RATE_TABLE_KEYWORDS_RE = re.compile(r"interest|rate|deposit|time|fixed|ดอกเบี้ย|อัตรา|เงินฝาก|ประจำ|เดือน", re.IGNORECASE)
 
 
 class Bot:
@@ -21,13 +73,21 @@ class Bot:
     author = "Scraper Kit"
     version = "0.1.0"
 
+    # instance state is fixed, so skip the per-instance __dict__; class metadata above stays on the class
+    __slots__ = ("headers", "timeout", "output_dir", "bank_sources", "bank_selectors", "_host_locks", "_last_request", "_http_cache")
+
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        })
+        self.headers = {
+            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+            "Accept-Encoding": "gzip, br",
+        }
         self.timeout = 20
         self.output_dir = "data/thai_fixed_deposits"
+        # Conditional GET validators and bodies per URL, persisted between runs: {url: {"etag", "last_modified", "body"}}
+        self._http_cache: Dict[str, Dict[str, Optional[str]]] = {}
+        # Per-host politeness: requests to one host are spaced by delay_seconds, other hosts proceed in parallel
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._last_request: Dict[str, float] = {}
 
         # Candidate URLs per bank (kept as a list to improve robustness if structures move)
         self.bank_sources: Dict[str, List[str]] = {
@@ -51,6 +111,15 @@ class Bot:
             ],
         }
 
+        # Candidate locations of each bank's rate rows (not verified against the live pages; adjust as
+        # they are confirmed). Selected rows still pass the rate-table header check, and the generic
+        # table scan covers every table they don't reach, so a wrong or partial hit loses nothing.
+        self.bank_selectors: Dict[str, List[str]] = {
+            "bangkok_bank": ["table.rate-table tbody tr"],
+            "kasikorn": ["table.tbl-rate tr"],
+            "gh_bank": ["table.interest-rate-table tr"],
+        }
+
     # -----------------------------
     # Public API
     # -----------------------------
@@ -62,33 +131,63 @@ class Bot:
         :param delay_seconds: Delay between HTTP requests to be polite.
         :return: dict containing scrape results and output file path.
         """
+        return asyncio.run(self._run_async(list(banks), delay_seconds))
+
+    async def _run_async(self, banks: List[str], delay_seconds: float) -> Dict[str, Any]:
         try:
-            import os
             os.makedirs(self.output_dir, exist_ok=True)
 
-            target_banks = list(banks) if banks else list(self.bank_sources.keys())
+            target_banks = banks or list(self.bank_sources.keys())
+            # asyncio locks belong to one event loop; start fresh for each asyncio.run()
+            self._host_locks = {}
+            self._http_cache = self._load_http_cache()
 
-            results: Dict[str, Any] = {
-                "scraped_at": datetime.utcnow().isoformat(),
-                "banks": {},
-                "errors": {},
-            }
-
-            for bank in target_banks:
-                try:
-                    data = self._scrape_bank(bank, delay_seconds=delay_seconds)
-                    results["banks"][bank] = data
-                except Exception as e:
-                    results["errors"][bank] = str(e)
-                time.sleep(delay_seconds)
-
-            timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+            # One clock reading per run: the file name, the top-level and every bank's scraped_at all agree
+            now = datetime.utcnow()
+            scraped_at = now.isoformat()
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             output_file = f"{self.output_dir}/fd_rates_{timestamp}.json"
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            # Assembled under a .part name so readers never pick up a half-written file
+            partial_file = f"{output_file}.part"
+
+            saved_banks: List[str] = []
+            errors: Dict[str, str] = {}
+            # Banks are scraped concurrently; each bank still walks its candidate URLs one at a time
+            limits = httpx.Limits(max_connections=16, max_keepalive_connections=8)
+            async with httpx.AsyncClient(headers=self.headers, timeout=self.timeout, follow_redirects=True, limits=limits) as client:
+                tasks = [
+                    asyncio.ensure_future(self._scrape_bank_async(client, bank, scraped_at, delay_seconds=delay_seconds))
+                    for bank in target_banks
+                ]
+                try:
+                    with open(partial_file, "wb") as f:
+                        # Same indent=2 {"scraped_at", "banks", "errors"} document as before, but each bank record is
+                        # written once it and every bank requested before it are done, instead of holding all results
+                        f.write(b'{\n  "scraped_at": ' + self._dump_json(scraped_at) + b',\n  "banks": {')
+                        # Awaiting in request order keeps the file layout stable across runs
+                        for bank, task in zip(target_banks, tasks):
+                            try:
+                                data = await task
+                            except Exception as e:
+                                errors[bank] = str(e)
+                                continue
+                            f.write(b",\n    " if saved_banks else b"\n    ")
+                            f.write(self._dump_json(bank) + b": " + self._indent_json(self._dump_json(data), 4))
+                            saved_banks.append(bank)
+                        f.write(b"\n  }" if saved_banks else b"}")
+                        f.write(b',\n  "errors": ' + self._indent_json(self._dump_json(errors), 2) + b"\n}")
+                    os.replace(partial_file, output_file)
+                except BaseException:
+                    # Don't leave a half-written .part file (or orphaned scrapes) behind
+                    for task in tasks:
+                        task.cancel()
+                    with contextlib.suppress(OSError):
+                        os.remove(partial_file)
+                    raise
+            self._save_http_cache()
 
             print(f"Saved results to {output_file}")
-            return {"status": "success", "output_file": output_file, "banks": list(results["banks"].keys()), "errors": results["errors"]}
+            return {"status": "success", "output_file": output_file, "banks": saved_banks, "errors": errors}
 
         except Exception as e:
             return {"status": "error", "error": str(e)}
@@ -117,146 +216,260 @@ class Bot:
     # -----------------------------
     # Internal helpers
     # -----------------------------
-    def _scrape_bank(self, bank: str, delay_seconds: float = 0.8) -> Dict[str, Any]:
+    async def _scrape_bank_async(
+        self, client: httpx.AsyncClient, bank: str, scraped_at: str, delay_seconds: float = 0.8
+    ) -> Dict[str, Any]:
         if bank not in self.bank_sources:
             raise ValueError(f"Unsupported bank: {bank}")
 
         offers: List[Dict[str, Any]] = []
+        seen: Set[Tuple[Any, Any, str]] = set()  # (term, rate, product) of offers kept so far
         tried_urls: List[str] = []
         for url in self.bank_sources[bank]:
             tried_urls.append(url)
             try:
-                html = self._fetch(url)
+                html = await self._fetch_async(client, url, delay_seconds)
                 if not html:
                     continue
-                soup = BeautifulSoup(html, "html.parser")
-
-                # Try table-driven extraction first
-                table_offers = self._extract_from_tables(soup)
-                if table_offers:
-                    offers.extend(table_offers)
-
-                # Additionally, attempt a generic pattern search across lists/divs
-                generic_offers = self._extract_generic_blocks(soup)
-                for g in generic_offers:
-                    if g not in offers:
-                        offers.append(g)
+                tree = self._parse(html)
+                # Table-driven extraction first; the generic scan across lists/divs only runs if no rate table matched
+                page_offers, covered = self._extract_from_selectors(tree, self.bank_selectors.get(bank, []))
+                page_offers += self._extract_from_tables(tree, skip=covered)
+                if not page_offers:
+                    page_offers = self._extract_generic_blocks(tree)
+
+                for o in page_offers:
+                    key = (o.get("term"), o.get("rate"), (o.get("product") or "").lower())
+                    if key not in seen:
+                        seen.add(key)
+                        offers.append(o)
 
                 if offers:
                     break  # Found data on this URL
             except Exception:
                 # Try next candidate URL
                 continue
-            finally:
-                time.sleep(delay_seconds)
-
-        # De-duplicate by (term, rate, product)
-        dedup: Dict[str, Dict[str, Any]] = {}
-        for o in offers:
-            key = f"{o.get('term')}|{o.get('rate')}|{(o.get('product') or '').lower()}"
-            dedup[key] = o
 
         return {
             "bank": bank,
-            "scraped_at": datetime.utcnow().isoformat(),
+            "scraped_at": scraped_at,
             "tried_urls": tried_urls,
-            "offers": list(dedup.values()),
+            "offers": offers,
         }
 
-    def _fetch(self, url: str) -> Optional[str]:
-        resp = self.session.get(url, timeout=self.timeout)
+    async def _fetch_async(self, client: httpx.AsyncClient, url: str, delay_seconds: float = 0.8) -> Optional[str]:
+        host = urlparse(url).netloc
+        async with self._host_locks.setdefault(host, asyncio.Lock()):
+            wait = self._last_request.get(host, float("-inf")) + delay_seconds - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request[host] = time.monotonic()
+        cached = self._http_cache.get(url)
+        conditional: Dict[str, str] = {}
+        if cached:
+            if cached.get("etag"):
+                conditional["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                conditional["If-Modified-Since"] = cached["last_modified"]
+        resp = await client.get(url, headers=conditional)
+        if resp.status_code == 304 and cached:
+            return cached["body"]
         if resp.status_code >= 400:
             return None
+        etag, last_modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._http_cache[url] = {"etag": etag, "last_modified": last_modified, "body": resp.text}
         return resp.text
 
-    def _extract_from_tables(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _load_http_cache(self) -> Dict[str, Dict[str, Optional[str]]]:
+        try:
+            with open(f"{self.output_dir}/.http_cache.json", "rb") as f:
+                data = f.read()
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            # Missing or corrupt cache: every URL is fetched unconditionally
+            return {}
+
+    def _save_http_cache(self) -> None:
+        with open(f"{self.output_dir}/.http_cache.json", "wb") as f:
+            f.write(self._dump_json(self._http_cache))
+
+    @staticmethod
+    def _indent_json(data: bytes, spaces: int) -> bytes:
+        # Shift a serialized document right to nest it; JSON strings never contain a raw newline
+        return data.replace(b"\n", b"\n" + b" " * spaces)
+
+    @staticmethod
+    def _dump_json(obj: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+    # The extractors work on either a LexborHTMLParser tree or an lxml root element
+    @staticmethod
+    def _parse(html: str) -> Any:
+        if LexborHTMLParser is not None:
+            return LexborHTMLParser(html)
+        return lxml_html.fromstring(_XML_DECL_RE.sub("", html, count=1))
+
+    @staticmethod
+    def _select(tree: Any, selector: str) -> List[Any]:
+        if LexborHTMLParser is not None:
+            return tree.css(selector)
+        return _css_xpath(selector)(tree) if CSSSelector is not None else []
+
+    @staticmethod
+    def _tables(tree: Any) -> List[Any]:
+        return tree.css("table") if LexborHTMLParser is not None else _XP_TABLES(tree)
+
+    @staticmethod
+    def _rows(table: Any) -> List[Any]:
+        return table.css("tr") if LexborHTMLParser is not None else _XP_ROWS(table)
+
+    @staticmethod
+    def _cells(node: Any) -> List[Any]:
+        return node.css("th, td") if LexborHTMLParser is not None else _XP_CELLS(node)
+
+    @staticmethod
+    def _header_cells(table: Any, limit: int = 10) -> List[Any]:
+        """The first `limit` th/td cells of a table; lazy walks stop there instead of collecting every cell."""
+        if LexborHTMLParser is not None:
+            cells = (n for n in table.traverse() if n.tag in ("th", "td"))
+        else:
+            cells = table.iter("th", "td")
+        return list(islice(cells, limit))
+
+    @staticmethod
+    def _text(node: Any) -> str:
+        return node.text(separator=" ") if LexborHTMLParser is not None else " ".join(node.itertext())
+
+    @staticmethod
+    def _parent(node: Any) -> Optional[Any]:
+        return node.parent if LexborHTMLParser is not None else node.getparent()
+
+    @staticmethod
+    def _node_key(node: Any) -> Any:
+        # Lexbor hands out a fresh wrapper per access, so identify nodes by their address; lxml elements are stable
+        return node.mem_id if LexborHTMLParser is not None else node
+
+    @staticmethod
+    def _percent_holders(tree: Any) -> List[Any]:
+        """Elements directly holding a text node with a "%" sign (entities such as &#37; arrive decoded)."""
+        # The number may sit in another node (1.50<sup>%</sup>), so the sign alone is the anchor;
+        # the enclosing block's joined text is what gets validated as an offer
+        if LexborHTMLParser is not None:
+            return [
+                n.parent for n in tree.root.traverse(include_text=True)
+                if n.tag == "-text" and "%" in (n.text_content or "")
+            ]
+        # lxml hangs tail text off the preceding sibling, so step up once more for those
+        return [s.getparent().getparent() if s.is_tail else s.getparent() for s in _XP_PERCENT_TEXT(tree)]
+
+    def _extract_from_selectors(self, tree: Any, selectors: List[str]) -> Tuple[List[Dict[str, Any]], Set[Any]]:
+        """
+        Offers from the rows matched by `selectors`, plus the keys of the rate tables those rows belong to
+        (so the generic table scan can skip them). Rows of tables failing the header check are ignored.
+        """
         offers: List[Dict[str, Any]] = []
-        tables = soup.find_all("table")
-        for table in tables:
-            headers = [self._norm_text(th.get_text(" ")) for th in table.find_all(["th", "td"], recursive=True)][:10]
-            header_blob = " ".join(headers)
-            if not self._looks_like_rate_table(header_blob):
+        is_rate_table: Dict[Any, bool] = {}  # table key -> header check result
+        for selector in selectors:
+            for row in self._select(tree, selector):
+                table = self._parent(row)
+                while table is not None and table.tag != "table":
+                    table = self._parent(table)
+                if table is None:
+                    continue
+                key = self._node_key(table)
+                if key not in is_rate_table:
+                    is_rate_table[key] = self._is_rate_table(table)
+                if is_rate_table[key]:
+                    offer = self._offer_from_row(row)
+                    if offer:
+                        offers.append(offer)
+        return offers, {key for key, ok in is_rate_table.items() if ok}
+
+    def _is_rate_table(self, table: Any) -> bool:
+        headers = [self._norm_text(self._text(th)) for th in self._header_cells(table)]
+        return self._looks_like_rate_table(" ".join(headers))
+
+    def _extract_from_tables(self, tree: Any, skip: Set[Any] = frozenset()) -> List[Dict[str, Any]]:
+        offers: List[Dict[str, Any]] = []
+        for table in self._tables(tree):
+            if skip and self._node_key(table) in skip:
+                # Already read through bank_selectors
+                continue
+            if not self._is_rate_table(table):
                 # Skip unrelated tables
                 continue
 
-            for tr in table.find_all("tr"):
-                cells = [self._norm_text(td.get_text(" ")) for td in tr.find_all(["td", "th"])]
-                if len(cells) < 2:
-                    continue
-                # Try to find a term (e.g., 3 months, 6M, 12 เดือน) and a rate (e.g., 1.50%)
-                term = self._extract_term(" ".join(cells))
-                rate = self._extract_rate(" ".join(cells))
-
-                if term and rate is not None:
-                    product = None
-                    # If there are more than 2 cells, first cell may be product name
-                    if len(cells) >= 3:
-                        product = cells[0]
-                    offers.append({
-                        "product": product,
-                        "term": term,
-                        "rate": rate,
-                        "raw": cells,
-                    })
+            for tr in self._rows(table):
+                offer = self._offer_from_row(tr)
+                if offer:
+                    offers.append(offer)
         return offers
 
-    def _extract_generic_blocks(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
+    def _offer_from_row(self, tr: Any) -> Optional[Dict[str, Any]]:
+        # Match on the row's text in one pass (e.g., 3 months, 6M, 12 เดือน and 1.50%);
+        # cells are only walked one by one for rows that hold an offer
+        term, rate = self._extract_offer(self._norm_text(self._text(tr)))
+        if not term or rate is None:
+            return None
+        cells = [self._norm_text(self._text(td)) for td in self._cells(tr)]
+        if len(cells) < 2:
+            return None
+        product = None
+        # If there are more than 2 cells, first cell may be product name
+        if len(cells) >= 3:
+            product = cells[0]
+        return {
+            "product": product,
+            "term": term,
+            "rate": rate,
+            "raw": cells,
+        }
+
+    def _extract_generic_blocks(self, tree: Any) -> List[Dict[str, Any]]:
         offers: List[Dict[str, Any]] = []
-        blocks = soup.find_all(["section", "div", "li", "article"])
-        for b in blocks:
-            text = self._norm_text(b.get_text(" "))
-            if "%" not in text:
-                continue
-            rate = self._extract_rate(text)
-            term = self._extract_term(text)
-            if rate is not None and term:
-                offers.append({"product": None, "term": term, "rate": rate, "raw": text[:180]})
+        # Start from the text nodes holding a rate and climb to the nearest block that also names a term,
+        # instead of serializing the text of every (nested) block on the page
+        checked: Set[Any] = set()  # blocks already evaluated; an earlier climb covered everything above them
+        for node in self._percent_holders(tree):
+            while node is not None:
+                if node.tag in _BLOCK_TAGS:
+                    key = self._node_key(node)
+                    if key in checked:
+                        break
+                    checked.add(key)
+                    text = self._norm_text(self._text(node))
+                    term, rate = self._extract_offer(text)
+                    if rate is not None and term:
+                        offers.append({"product": None, "term": term, "rate": rate, "raw": text[:180]})
+                        break
+                node = self._parent(node)
         return offers
 
     def _looks_like_rate_table(self, text: str) -> bool:
-        keywords = [
-            "interest", "rate", "deposit", "time", "fixed",
-            # Thai equivalents
-            "ดอกเบี้ย", "อัตรา", "เงินฝาก", "ประจำ", "เดือน",
-        ]
-        t = text.lower()
-        return any(k in t for k in keywords)
-
-    def _extract_rate(self, text: str) -> Optional[float]:
-        # Capture patterns like 1.50%, 2%, 0.85 %
-        m = re.search(r"(\d{1,2}(?:\.\d{1,3})?)\s*%", text)
-        if not m:
-            return None
-        try:
-            return float(m.group(1))
-        except ValueError:
-            return None
+        return _RATE_TABLE_KEYWORDS_RE.search(text) is not None
+
+    def _extract_offer(self, text: str) -> Tuple[Optional[str], Optional[float]]:
+        """
+        Scan `text` once and return its first (term, rate), e.g. ("6M", 1.5).
 
-    def _extract_term(self, text: str) -> Optional[str]:
-        t = text.lower()
-        # English months/years
-        m = re.search(r"(\d{1,2})\s*(month|months|mo|m)\b", t)
-        if m:
-            return f"{int(m.group(1))}M"
-        m = re.search(r"(\d{1,2})\s*(year|years|yr|y)\b", t)
-        if m:
-            return f"{int(m.group(1))}Y"
-        # Thai: e.g., 3 เดือน, 12 เดือน, 1 ปี
-        m = re.search(r"(\d{1,2})\s*เดือน", t)
-        if m:
-            return f"{int(m.group(1))}M"
-        m = re.search(r"(\d{1,2})\s*ปี", t)
-        if m:
-            return f"{int(m.group(1))}Y"
-        # Sometimes shown like 3M/6M/12M
-        m = re.search(r"\b(\d{1,2})\s*[mM]\b", t)
-        if m:
-            return f"{int(m.group(1))}M"
-        m = re.search(r"\b(\d{1,2})\s*[yY]\b", t)
-        if m:
-            return f"{int(m.group(1))}Y"
-        return None
+        When several terms appear the leftmost wins, whatever its unit: "1 ปี (12 เดือน) 1.5%" gives ("1Y", 1.5).
+        (The older per-pattern searches preferred months and returned "12M" for that text.)
+        """
+        term: Optional[str] = None
+        rate: Optional[float] = None
+        for m in _OFFER_RE.finditer(text.lower()):
+            if m.group("rate") is not None:
+                if rate is None:
+                    rate = float(m.group("rate"))
+            elif term is None:
+                term = f"{int(m.group('num'))}{'M' if m.group('month') else 'Y'}"
+            if term is not None and rate is not None:
+                break
+        return term, rate
 
     @staticmethod
     def _norm_text(s: str) -> str:
-        return re.sub(r"\s+", " ", (s or "")).strip()
+        return _WS_RE.sub(" ", s or "").strip().translate(_THAI_DIGITS)